@@ -10,49 +10,45 @@ def create_sample_dataset():
     Create a sample dataset for training the network traffic analyzer
     """
     # Create sample data with features similar to what the analyzer expects
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
-    # Generate benign traffic samples
-    benign_samples = 1000
-    benign_data = {
-        'packet_count': np.random.normal(500, 100, benign_samples),
-        'byte_count': np.random.normal(50000, 10000, benign_samples),
-        'duration': np.random.exponential(30, benign_samples),
-        'avg_packet_size': np.random.normal(1000, 200, benign_samples),
-        'bytes_per_second': np.random.normal(2000, 500, benign_samples),
-        'packets_per_second': np.random.normal(20, 5, benign_samples),
-        'flow_duration': np.random.exponential(60, benign_samples),
-        'label': [0] * benign_samples  # 0 for benign
-    }
+    feature_names = ['packet_count', 'byte_count', 'duration', 'avg_packet_size',
+                     'bytes_per_second', 'packets_per_second', 'flow_duration']
+    normal_columns = [0, 1, 3, 4, 5]
+    exponential_columns = [2, 6]
     
-    # Generate malicious traffic samples
-    malicious_samples = 300
-    malicious_data = {
-        'packet_count': np.random.normal(2000, 500, malicious_samples),
-        'byte_count': np.random.normal(200000, 50000, malicious_samples),
-        'duration': np.random.exponential(120, malicious_samples),
-        'avg_packet_size': np.random.normal(800, 150, malicious_samples),
-        'bytes_per_second': np.random.normal(5000, 1000, malicious_samples),
-        'packets_per_second': np.random.normal(50, 15, malicious_samples),
-        'flow_duration': np.random.exponential(300, malicious_samples),
-        'label': [1] * malicious_samples  # 1 for malicious
-    }
+    # Benign traffic samples first, then malicious traffic samples
+    class_counts = [1000, 300]
+    normal_loc = np.array([[500, 50000, 1000, 2000, 20],
+                           [2000, 200000, 800, 5000, 50]], dtype=np.float64)
+    normal_scale = np.array([[100, 10000, 200, 500, 5],
+                             [500, 50000, 150, 1000, 15]], dtype=np.float64)
+    exponential_scale = np.array([[30, 60],
+                                  [120, 300]], dtype=np.float64)
     
-    # Combine datasets
-    combined_data = {}
-    for key in benign_data.keys():
-        combined_data[key] = list(benign_data[key]) + list(malicious_data[key])
+    # Expand the per-class parameters to one row per sample
+    normal_loc = np.repeat(normal_loc, class_counts, axis=0)
+    normal_scale = np.repeat(normal_scale, class_counts, axis=0)
+    exponential_scale = np.repeat(exponential_scale, class_counts, axis=0)
     
-    # Create DataFrame
-    df = pd.DataFrame(combined_data)
+    # Draw every feature of every sample with one call per distribution
+    normal = rng.standard_normal(normal_loc.shape)
+    normal *= normal_scale
+    normal += normal_loc
     
-    # Ensure no negative values
-    numeric_columns = ['packet_count', 'byte_count', 'duration', 'avg_packet_size', 
-                      'bytes_per_second', 'packets_per_second', 'flow_duration']
-    for col in numeric_columns:
-        df[col] = np.abs(df[col])
+    # Ensure no negative values (exponential draws are never negative)
+    np.abs(normal, out=normal)
     
-    return df
+    data = np.empty((sum(class_counts), len(feature_names)), dtype=np.float64)
+    data[:, normal_columns] = normal
+    data[:, exponential_columns] = rng.exponential(exponential_scale)
+    
+    # 0 for benign, 1 for malicious
+    labels = np.empty(len(data), dtype=np.int8)
+    labels[:class_counts[0]] = 0
+    labels[class_counts[0]:] = 1
+    
+    return pd.DataFrame(data, columns=feature_names, copy=False).assign(label=labels)
 
 def main():
     """
@@ -8,11 +8,43 @@ import os
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+def _run_network_analyzer(argv):
+    from src.tools.network_traffic_analyzer import main as network_main
+    network_main(argv)
+
+def _run_volatility(argv):
+    from src.utils.volatility_integration import main as volatility_main
+    volatility_main(argv)
+
+def _run_case_pipeline(argv):
+    from src.data.case_pipeline import main as case_main
+    case_main(argv)
+
 def main():
     """
     Dispatcher for the ML & Data-Driven Forensic Automation Toolkit
     """
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description='ML & Data-Driven Forensic Automation Toolkit')
+    subparsers = parser.add_subparsers(dest='module')
+
+    # Each module parses its own options, so the subcommands only select the
+    # module and leave everything after it (including --help) to that module
+    subparsers.add_parser(
+        "network-analyzer", add_help=False,
+        help="Analyze network traffic for malicious patterns"
+    ).set_defaults(func=_run_network_analyzer)
+    subparsers.add_parser(
+        "volatility-int", add_help=False,
+        help="Integrate with Volatility 3 for memory forensics"
+    ).set_defaults(func=_run_volatility)
+    subparsers.add_parser(
+        "case-pipeline", add_help=False,
+        help="Handle CASE-compliant forensic data"
+    ).set_defaults(func=_run_case_pipeline)
+
+    args, module_argv = parser.parse_known_args()
+
+    if args.module is None:
         print("ML & Data-Driven Forensic Automation Toolkit")
         print("============================================")
         print("Available modules:")
@@ -22,26 +54,7 @@ def main():
         print("\nUse 'python main.py [module] --help' for more information.")
         return
 
-    module = sys.argv[1]
-    
-    if module == "network-analyzer":
-        from src.tools.network_traffic_analyzer import main as network_main
-        sys.argv = [sys.argv[0]] + sys.argv[2:]
-        network_main()
-        
-    elif module == "volatility-int":
-        from src.utils.volatility_integration import main as volatility_main
-        sys.argv = [sys.argv[0]] + sys.argv[2:]
-        volatility_main()
-        
-    elif module == "case-pipeline":
-        from src.data.case_pipeline import main as case_main
-        sys.argv = [sys.argv[0]] + sys.argv[2:]
-        case_main()
-        
-    else:
-        print(f"Unknown module: {module}")
-        print("Available modules: network-analyzer, volatility-int, case-pipeline")
+    args.func(module_argv)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
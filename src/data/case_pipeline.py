@@ -1,14 +1,33 @@
 import json
 import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+try:
+    # orjson pretty-prints large graphs much faster than json.dump
+    import orjson
+except ImportError:
+    orjson = None
+
 class CASEDataPipeline:
     """
     Data pipeline for handling CASE (Cyber-investigation Analysis Standard Expression) 
     compliant forensic data.
     """
     
+    # CASE graph keys exported by to_dataframe, mapped to their column names
+    _COLUMN_MAP = {
+        "@id": "id",
+        "@type": "type",
+        "case:description": "description",
+        "case:value": "value",
+        "case:filePath": "file_path",
+        "case:hash": "hash",
+        "case:observableType": "observable_type"
+    }
+    
     def __init__(self):
         self.case_data = {
             "@context": {
@@ -19,6 +38,9 @@ class CASEDataPipeline:
             },
             "@graph": []
         }
+        # Lookup tables over the graph, kept in sync by the add/load methods
+        self._by_type = defaultdict(list)
+        self._by_id = {}
         
     def add_investigation(self, investigation_id: str, title: str, 
                          description: str, start_date: Optional[str] = None) -> str:
@@ -45,7 +67,7 @@ class CASEDataPipeline:
             "case:startTime": start_date
         }
         
-        self.case_data["@graph"].append(investigation)
+        self._extend_graph((investigation,))
         return investigation["@id"]
     
     def add_evidence(self, evidence_id: str, investigation_id: str,
@@ -65,6 +87,53 @@ class CASEDataPipeline:
         # Calculate file hash
         file_hash = self._calculate_file_hash(file_path)
         
+        items = self._evidence_items(evidence_id, investigation_id, file_path,
+                                     file_hash, description)
+        self._extend_graph(items)
+        return items[0]["@id"]
+    
+    def add_evidence_batch(self, records: List[tuple],
+                           max_workers: Optional[int] = None) -> List[str]:
+        """
+        Add many evidence files, hashing them in parallel worker processes
+        
+        On platforms that start workers with spawn (Windows, and macOS by
+        default), the worker processes re-import the calling script, so callers
+        must invoke this from under an ``if __name__ == "__main__":`` guard.
+        
+        Args:
+            records: Tuples of (evidence_id, investigation_id, file_path) with an
+                optional trailing description, as taken by add_evidence
+            max_workers: Number of hashing processes (defaults to the CPU count);
+                keep it low when the files share a single spinning disk
+            
+        Returns:
+            List of evidence identifiers, in input order
+        """
+        if not records:
+            return []
+            
+        file_paths = [record[2] for record in records]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            file_hashes = list(executor.map(self._calculate_file_hash, file_paths))
+            
+        items = [
+            item
+            for record, file_hash in zip(records, file_hashes)
+            for item in self._evidence_items(*record[:3], file_hash, *record[3:])
+        ]
+        self._extend_graph(items)
+        return [evidence["@id"] for evidence in items[::2]]
+    
+    def _evidence_items(self, evidence_id: str, investigation_id: str,
+                        file_path: str, file_hash: str,
+                        description: Optional[str] = None) -> tuple:
+        """
+        Build the graph items for an evidence file and its link to the investigation
+        
+        Returns:
+            Tuple of (evidence, relationship)
+        """
         evidence = {
             "@id": f"evidence:{evidence_id}",
             "@type": "case:File",
@@ -73,8 +142,6 @@ class CASEDataPipeline:
             "case:description": description or f"Evidence file: {file_path}"
         }
         
-        self.case_data["@graph"].append(evidence)
-        
         # Link evidence to investigation
         relationship = {
             "@id": f"relationship:{investigation_id}-{evidence_id}",
@@ -84,8 +151,7 @@ class CASEDataPipeline:
             "case:relationshipKind": "investigates"
         }
         
-        self.case_data["@graph"].append(relationship)
-        return evidence["@id"]
+        return evidence, relationship
     
     def add_observable(self, observable_id: str, evidence_id: str,
                       observable_type: str, value: str, description: Optional[str] = None) -> str:
@@ -102,6 +168,35 @@ class CASEDataPipeline:
         Returns:
             Observable identifier
         """
+        items = self._observable_items(observable_id, evidence_id, observable_type,
+                                       value, description)
+        self._extend_graph(items)
+        return items[0]["@id"]
+    
+    def add_observables_bulk(self, records: List[tuple]) -> List[str]:
+        """
+        Add many observables to the CASE data in one graph update
+        
+        Args:
+            records: Tuples of (observable_id, evidence_id, observable_type, value)
+                with an optional trailing description, as taken by add_observable
+            
+        Returns:
+            List of observable identifiers, in input order
+        """
+        items = [item for record in records for item in self._observable_items(*record)]
+        self._extend_graph(items)
+        return [observable["@id"] for observable in items[::2]]
+    
+    def _observable_items(self, observable_id: str, evidence_id: str,
+                          observable_type: str, value: str,
+                          description: Optional[str] = None) -> tuple:
+        """
+        Build the graph items for an observable and its link to the evidence
+        
+        Returns:
+            Tuple of (observable, relationship)
+        """
         observable = {
             "@id": f"observable:{observable_id}",
             "@type": "case:ObservableObject",
@@ -110,8 +205,6 @@ class CASEDataPipeline:
             "case:description": description or f"{observable_type}: {value}"
         }
         
-        self.case_data["@graph"].append(observable)
-        
         # Link observable to evidence
         relationship = {
             "@id": f"relationship:{evidence_id}-{observable_id}",
@@ -121,10 +214,43 @@ class CASEDataPipeline:
             "case:relationshipKind": "contains"
         }
         
-        self.case_data["@graph"].append(relationship)
-        return observable["@id"]
+        return observable, relationship
+    
+    def _extend_graph(self, items):
+        """
+        Append items to the graph with a single extend and index them
+        
+        Args:
+            items: Sequence of CASE graph items
+        """
+        self.case_data["@graph"].extend(items)
+        for item in items:
+            self._index_item(item)
+    
+    def _index_item(self, item: Dict[str, Any]):
+        """
+        Record a graph item in the type and identifier lookup tables
+        
+        Args:
+            item: CASE graph item
+        """
+        item_type = item.get("@type")
+        if isinstance(item_type, str):
+            self._by_type[item_type].append(item)
+        if "@id" in item:
+            self._by_id[item["@id"]] = item
     
-    def _calculate_file_hash(self, file_path: str) -> str:
+    def _rebuild_index(self):
+        """
+        Rebuild the lookup tables from the current graph
+        """
+        self._by_type = defaultdict(list)
+        self._by_id = {}
+        for item in self.case_data["@graph"]:
+            self._index_item(item)
+    
+    @staticmethod
+    def _calculate_file_hash(file_path: str) -> str:
         """
         Calculate SHA256 hash of a file
         
@@ -134,12 +260,17 @@ class CASEDataPipeline:
         Returns:
             SHA256 hash of the file
         """
-        sha256_hash = hashlib.sha256()
         try:
             with open(file_path, "rb") as f:
-                # Read and update hash string value in blocks of 4K
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
+                # Python 3.11+ keeps the whole read/update loop in C
+                if hasattr(hashlib, "file_digest"):
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+
+                # Read and update hash in blocks of 1M, reusing a single buffer
+                sha256_hash = hashlib.sha256()
+                buffer = memoryview(bytearray(1 << 20))
+                for size in iter(lambda: f.readinto(buffer), 0):
+                    sha256_hash.update(buffer[:size])
             return sha256_hash.hexdigest()
         except FileNotFoundError:
             return "File not found"
@@ -151,8 +282,12 @@ class CASEDataPipeline:
         Args:
             file_path: Path to save the JSON file
         """
-        with open(file_path, 'w') as f:
-            json.dump(self.case_data, f, indent=2)
+        if orjson is not None:
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(self.case_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(file_path, 'w') as f:
+                json.dump(self.case_data, f, indent=2)
         print(f"CASE data saved to {file_path}")
     
     def load_from_json(self, file_path: str):
@@ -162,8 +297,14 @@ class CASEDataPipeline:
         Args:
             file_path: Path to the JSON file
         """
-        with open(file_path, 'r') as f:
-            self.case_data = json.load(f)
+        # JSON files are UTF-8 (orjson writes it raw), whatever the locale
+        if orjson is not None:
+            with open(file_path, 'rb') as f:
+                self.case_data = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self.case_data = json.load(f)
+        self._rebuild_index()
         print(f"CASE data loaded from {file_path}")
     
     def to_dataframe(self):
@@ -175,22 +316,13 @@ class CASEDataPipeline:
         """
         try:
             import pandas as pd
-            records = []
             
-            # Extract relevant information from the graph
-            for item in self.case_data["@graph"]:
-                record = {
-                    "id": item.get("@id", ""),
-                    "type": item.get("@type", ""),
-                    "description": item.get("case:description", ""),
-                    "value": item.get("case:value", ""),
-                    "file_path": item.get("case:filePath", ""),
-                    "hash": item.get("case:hash", ""),
-                    "observable_type": item.get("case:observableType", "")
-                }
-                records.append(record)
-                
-            return pd.DataFrame(records)
+            # Build each column directly from the graph (structure of arrays)
+            graph = self.case_data["@graph"]
+            return pd.DataFrame({
+                column: [item.get(key, "") for item in graph]
+                for key, column in self._COLUMN_MAP.items()
+            })
         except ImportError:
             print("Pandas not available. Returning raw data instead.")
             return self.case_data
@@ -202,13 +334,22 @@ class CASEDataPipeline:
         Returns:
             List of evidence file paths
         """
-        evidence_files = []
-        for item in self.case_data["@graph"]:
-            if item.get("@type") == "case:File" and "case:filePath" in item:
-                evidence_files.append(item["case:filePath"])
-        return evidence_files
+        return [item["case:filePath"] for item in self._by_type.get("case:File", ())
+                if "case:filePath" in item]
+    
+    def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a graph item by its identifier
+        
+        Args:
+            item_id: Identifier of the item (e.g. "evidence:ev_001")
+            
+        Returns:
+            The graph item, or None if no item has that identifier
+        """
+        return self._by_id.get(item_id)
 
-def main():
+def main(argv=None):
     """
     CLI interface for the CASE data pipeline
     """
@@ -243,7 +384,7 @@ def main():
         help="Load CASE data from JSON file"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Initialize the pipeline
     pipeline = CASEDataPipeline()
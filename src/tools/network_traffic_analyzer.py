@@ -1,13 +1,95 @@
 import numpy as np
 import pandas as pd
-from scapy.all import *
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
-import joblib
 import argparse
+import mmap
+import os
+import struct
 import sys
 
+# File extensions picked up when classifying a directory of captures
+PCAP_EXTENSIONS = ('.pcap', '.pcapng', '.cap')
+
+# Classic PCAP layout: magic number -> (byte order, timestamp ticks per second)
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e9),
+}
+PCAP_GLOBAL_HEADER_SIZE = 24
+PCAP_RECORD_HEADER_SIZE = 16
+LINKTYPE_ETHERNET = 1
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHER_TYPE_FIELD = struct.Struct('>H')
+
+# 802.1Q and 802.1ad tags, which may be stacked in front of the EtherType
+VLAN_ETHERTYPES = frozenset((0x8100, 0x88A8))
+
+# Frames scapy can (or, with contrib layers loaded, could) dissect down to an
+# IPv4 header through another encapsulation: MPLS, jumbo LLC, PPPoE session,
+# 802.1ah, legacy 0x9100 tags and 6LoWPAN. EtherTypes below 0x0600 are
+# 802.3 lengths, whose LLC/SNAP payload can also carry IPv4.
+ENCAPSULATING_ETHERTYPES = frozenset((0x8847, 0x8848, 0x8870, 0x8864, 0x88E7, 0x9100, 0xA0ED))
+MIN_ETHERTYPE = 0x0600
+
+# IPv6 payloads that never lead scapy to an IPv4 header: TCP, No Next Header,
+# and ICMPv6 echo, neighbour discovery (except redirects) and MLDv2 reports
+IPV6_LEAF_NEXT_HEADERS = frozenset((6, 59))
+IPPROTO_ICMPV6 = 58
+ICMPV6_LEAF_TYPES = frozenset(range(128, 137)) | {143}
+
+def _model_compression():
+    """
+    Pick the joblib compression for saved models: LZ4 when available, since it
+    shrinks the file several times and decompresses faster than disk reads,
+    otherwise no compression
+    """
+    try:
+        import lz4.frame  # noqa: F401
+    except ImportError:
+        return 0
+    return ('lz4', 1)
+
+def _frame_is_ipv4(capture, frame, frame_length):
+    """
+    Tell from its link-layer headers whether scapy would find an IPv4 header
+    in an Ethernet frame
+    
+    Returns True or False, or None when only dissecting the frame can tell
+    """
+    if frame_length < 14:
+        return False
+    frame_end = frame + frame_length
+    
+    position = frame + 12
+    ether_type, = ETHER_TYPE_FIELD.unpack_from(capture, position)
+    while ether_type in VLAN_ETHERTYPES:
+        position += 4
+        if position + 2 > frame_end:
+            return False
+        ether_type, = ETHER_TYPE_FIELD.unpack_from(capture, position)
+        
+    if ether_type == ETHERTYPE_IPV4:
+        return True
+    if ether_type == ETHERTYPE_IPV6:
+        # IPv6 can tunnel IPv4 directly, over UDP or GRE, or quote it in ICMPv6
+        network = position + 2
+        if network + 40 >= frame_end:
+            return None
+        next_header = capture[network + 6]
+        if next_header in IPV6_LEAF_NEXT_HEADERS:
+            return False
+        if next_header == IPPROTO_ICMPV6 and capture[network + 40] in ICMPV6_LEAF_TYPES:
+            return False
+        return None
+    if ether_type < MIN_ETHERTYPE or ether_type in ENCAPSULATING_ETHERTYPES:
+        return None
+    return False
+
 class NetworkTrafficAnalyzer:
     """
     A Python implementation similar to FlowMeter for classifying network traffic
@@ -21,28 +103,134 @@ class NetworkTrafficAnalyzer:
             'avg_packet_size', 'bytes_per_second',
             'packets_per_second', 'flow_duration'
         ]
+        # Reusable input row for single-sample classification
+        self._scratch = np.empty((1, len(self.feature_names)), dtype=np.float32)
         
     def extract_features(self, pcap_file):
         """
         Extract features from PCAP file for ML analysis
         """
         print(f"Extracting features from {pcap_file}")
-        packets = rdpcap(pcap_file)
         
-        # Initialize flow statistics
-        packet_count = len(packets)
-        byte_count = sum(len(packet) for packet in packets)
+        # Read only the record headers when the capture format allows it
+        flow_stats = self._scan_pcap_headers(pcap_file)
+        if flow_stats is None:
+            flow_stats = self._scan_pcap_packets(pcap_file)
+        packet_count, byte_count, duration = flow_stats
         
         if packet_count == 0:
             return None
             
+        return self._flow_features(packet_count, byte_count, duration)
+    
+    @staticmethod
+    def _scan_pcap_headers(pcap_file):
+        """
+        Reduce a classic Ethernet PCAP file to flow statistics from its record
+        headers, without dissecting any packets
+        
+        Returns (packet_count, byte_count, duration), or None if the file is
+        not a classic PCAP capture of Ethernet frames or holds frames that
+        need a full dissection
+        """
+        file_size = os.path.getsize(pcap_file)
+        if file_size < PCAP_GLOBAL_HEADER_SIZE:
+            return None
+            
+        with open(pcap_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as capture:
+            magic = capture[:4]
+            if magic not in PCAP_MAGIC:
+                return None
+            byte_order, ticks_per_second = PCAP_MAGIC[magic]
+            
+            linktype, = struct.unpack_from(byte_order + 'I', capture, 20)
+            if linktype & 0xFFFF != LINKTYPE_ETHERNET:
+                return None
+                
+            # Records are variable length, so walk them one header at a time,
+            # keeping only running totals so memory stays constant
+            record_header = struct.Struct(byte_order + 'IIII')
+            packet_count = 0
+            byte_count = 0
+            first_time = None
+            last_time = None
+            offset = PCAP_GLOBAL_HEADER_SIZE
+            while offset + PCAP_RECORD_HEADER_SIZE <= file_size:
+                ts_sec, ts_frac, incl_len, _ = record_header.unpack_from(capture, offset)
+                frame = offset + PCAP_RECORD_HEADER_SIZE
+                offset = frame + incl_len
+                
+                # A truncated last record only counts the bytes actually captured
+                incl_len = min(incl_len, file_size - frame)
+                packet_count += 1
+                byte_count += incl_len
+                
+                # Timing features only consider IPv4 traffic; leave frames that
+                # may tunnel it to the packet scan
+                is_ipv4 = _frame_is_ipv4(capture, frame, incl_len)
+                if is_ipv4 is None:
+                    return None
+                if not is_ipv4:
+                    continue
+                    
+                timestamp = ts_sec + ts_frac / ticks_per_second
+                if first_time is None or timestamp < first_time:
+                    first_time = timestamp
+                if last_time is None or timestamp > last_time:
+                    last_time = timestamp
+                    
+        if first_time is not None:
+            duration = last_time - first_time
+        else:
+            duration = 0
+            
+        return packet_count, byte_count, duration
+    
+    @staticmethod
+    def _scan_pcap_packets(pcap_file):
+        """
+        Reduce any capture scapy can read to flow statistics by streaming
+        its packets
+        
+        Returns (packet_count, byte_count, duration)
+        """
+        # scapy is slow to import, so only load it when reading captures
+        from scapy.all import IP, PcapReader
+        
+        # Initialize flow statistics
+        packet_count = 0
+        byte_count = 0
+        first_time = None
+        last_time = None
+
+        # Stream the capture in a single pass instead of loading every packet
+        with PcapReader(pcap_file) as packets:
+            for packet in packets:
+                packet_count += 1
+                byte_count += len(packet)
+
+                # Timing features only consider IP traffic
+                if packet.haslayer(IP):
+                    timestamp = float(packet.time)
+                    if first_time is None or timestamp < first_time:
+                        first_time = timestamp
+                    if last_time is None or timestamp > last_time:
+                        last_time = timestamp
+
         # Calculate timing features
-        timestamps = [float(packet.time) for packet in packets if packet.haslayer(IP)]
-        if len(timestamps) > 1:
-            duration = max(timestamps) - min(timestamps)
+        if first_time is not None:
+            duration = last_time - first_time
         else:
             duration = 0
             
+        return packet_count, byte_count, duration
+    
+    @staticmethod
+    def _flow_features(packet_count, byte_count, duration):
+        """
+        Derive the feature vector from the reduced flow statistics
+        """
         # Calculate average packet size
         avg_packet_size = byte_count / packet_count if packet_count > 0 else 0
         
@@ -74,12 +262,18 @@ class NetworkTrafficAnalyzer:
         Train the Random Forest classifier
         """
         print("Training Random Forest classifier...")
+        # The tree splitters work in float32, so convert once up front
+        X = np.ascontiguousarray(X, dtype=np.float32)
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42
         )
         
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
         self.model.fit(X_train, y_train)
+        # Only the fit is worth parallelising; single-row predictions would
+        # pay for a thread pool on every call, and the setting is saved with
+        # the model
+        self.model.set_params(n_jobs=None)
         
         # Evaluate model
         y_pred = self.model.predict(X_test)
@@ -93,7 +287,8 @@ class NetworkTrafficAnalyzer:
         Save trained model to disk
         """
         if self.model is not None:
-            joblib.dump(self.model, filepath)
+            import joblib
+            joblib.dump(self.model, filepath, compress=_model_compression())
             print(f"Model saved to {filepath}")
         else:
             print("No model to save. Train a model first.")
@@ -102,7 +297,11 @@ class NetworkTrafficAnalyzer:
         """
         Load trained model from disk
         """
+        import joblib
         self.model = joblib.load(filepath)
+        # Models saved before fitting was limited to training keep n_jobs=-1
+        if getattr(self.model, 'n_jobs', None) is not None:
+            self.model.set_params(n_jobs=None)
         print(f"Model loaded from {filepath}")
     
     def classify_traffic(self, features):
@@ -112,20 +311,73 @@ class NetworkTrafficAnalyzer:
         if self.model is None:
             raise ValueError("No model loaded. Train or load a model first.")
             
-        features_array = np.array(features).reshape(1, -1)
-        prediction = self.model.predict(features_array)
-        probability = self.model.predict_proba(features_array)
+        self._scratch[0, :] = features
+        prediction = self.model.predict(self._scratch)
+        probability = self.model.predict_proba(self._scratch)
         
         return prediction[0], probability[0]
+    
+    def classify_traffic_batch(self, features_matrix):
+        """
+        Classify many flows at once as benign (0) or malicious (1)
+        
+        Takes an (n_flows, n_features) matrix and returns the predictions and
+        class probabilities for every row from a single model call.
+        """
+        if self.model is None:
+            raise ValueError("No model loaded. Train or load a model first.")
+            
+        features_matrix = np.ascontiguousarray(features_matrix, dtype=np.float32)
+        # A whole batch is large enough to spread the trees over all cores
+        self.model.set_params(n_jobs=-1)
+        try:
+            prediction = self.model.predict(features_matrix)
+            probability = self.model.predict_proba(features_matrix)
+        finally:
+            self.model.set_params(n_jobs=None)
+        
+        return prediction, probability
+    
+    def classify_directory(self, directory):
+        """
+        Classify every PCAP file in a directory with one batched prediction
+        """
+        pcap_files = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(PCAP_EXTENSIONS)
+        )
+        
+        features_matrix = np.empty((len(pcap_files), len(self.feature_names)), dtype=np.float32)
+        classified_files = []
+        for pcap_file in pcap_files:
+            # One unreadable capture should not stop the rest of the batch
+            try:
+                features = self.extract_features(pcap_file)
+            except Exception as e:
+                print(f"Could not extract features from {pcap_file}: {e}")
+                continue
+            if features is None:
+                print(f"Could not extract features from {pcap_file}")
+                continue
+            features_matrix[len(classified_files)] = features
+            classified_files.append(pcap_file)
+            
+        if not classified_files:
+            return []
+            
+        predictions, probabilities = self.classify_traffic_batch(
+            features_matrix[:len(classified_files)]
+        )
+        return list(zip(classified_files, predictions, probabilities))
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Network Traffic Analyzer')
     parser.add_argument('--train', help='CSV file for training the model')
-    parser.add_argument('--classify', help='PCAP file to classify')
+    parser.add_argument('--classify', help='PCAP file or directory of PCAP files to classify')
     parser.add_argument('--model', help='Path to saved model file')
     parser.add_argument('--save-model', help='Path to save trained model')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     analyzer = NetworkTrafficAnalyzer()
     
@@ -148,6 +400,15 @@ def main():
             print("Error: --model argument required for classification")
             sys.exit(1)
             
+        if os.path.isdir(args.classify):
+            results = analyzer.classify_directory(args.classify)
+            if not results:
+                print("No PCAP files could be classified in the directory")
+            for pcap_file, prediction, probability in results:
+                result = "Malicious" if prediction == 1 else "Benign"
+                print(f"{pcap_file}: {result} (confidence {max(probability):.2f})")
+            return
+            
         features = analyzer.extract_features(args.classify)
         if features is not None:
             prediction, probability = analyzer.classify_traffic(features)
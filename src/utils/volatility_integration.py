@@ -4,6 +4,13 @@ import os
 import sys
 from typing import Dict, List, Optional
 
+try:
+    # orjson parses large plugin output considerably faster than json
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 class VolatilityIntegration:
     """
     Integration with Volatility 3 for memory forensic analysis
@@ -37,13 +44,14 @@ class VolatilityIntegration:
         print(f"Running Volatility command: {' '.join(base_cmd)}")
         
         try:
-            # Run the command
-            result = subprocess.run(base_cmd, capture_output=True, text=True, check=True)
+            # Run the command, keeping stdout as bytes since the JSON parser
+            # accepts them directly
+            result = subprocess.run(base_cmd, capture_output=True, check=True)
             
             if output_format == "json":
-                return json.loads(result.stdout)
+                return _json_loads(result.stdout)
             else:
-                return {"output": result.stdout}
+                return {"output": result.stdout.decode("utf-8", "replace")}
                 
         except FileNotFoundError:
             # If the first command failed, and we have alternatives, try them
@@ -54,7 +62,7 @@ class VolatilityIntegration:
             return {"error": "Volatility 3 executable not found. Ensure 'vol' or 'vol.py' is in your PATH."}
         except subprocess.CalledProcessError as e:
             print(f"Error running Volatility: {e}")
-            print(f"stderr: {e.stderr}")
+            print(f"stderr: {e.stderr.decode('utf-8', 'replace')}")
             return {"error": str(e)}
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON output: {e}")
@@ -112,7 +120,7 @@ class VolatilityIntegration:
         return self.run_plugin("windows.registry.printkey.PrintKey", 
                               memory_image, additional_args=additional_args)
 
-def main():
+def main(argv=None):
     """
     CLI interface for the Volatility integration
     """
@@ -138,7 +146,7 @@ def main():
         help="Output file path"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if not args.plugin or not args.image:
         print("Error: --plugin and --image are required for most operations.")